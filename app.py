@@ -1,80 +1,159 @@
 """
-Flask web server for the Multi-Agent Market Intelligence System.
+Quart (async Flask) web server for the Multi-Agent Market Intelligence System.
 Routes:
   GET  /              → serve index.html
-  POST /run           → start pipeline, return {run_id}
-  GET  /stream/<id>  → SSE stream of log lines + final report
+  POST /run           → start pipeline (or join an identical one in flight), return {run_id}
+  GET  /stream/<id>  → SSE stream of log lines, live voice script + final report
+
+Pipelines run as tasks on a single event loop, so an idle SSE client
+costs a coroutine instead of a worker thread.
 """
 
-import json
+import asyncio
 import os
-import queue
-import threading
+import time
 import uuid
+from collections import deque
+from typing import Optional
 
-from flask import Flask, Response, jsonify, render_template, request
-from flask_cors import CORS
+import orjson
+from quart import Quart, Response, jsonify, render_template, request
+from quart_cors import cors
 
 # Import pipeline agents
-from market_intel import data_agent, trend_agent, strategy_agent, risk_agent, voice_agent
+from market_intel import (
+    data_agent, trend_and_strategy_agent, risk_agent, voice_agent, voice_brief, close_reka_session,
+    normalise_topic,
+)
+
+app = cors(Quart(__name__))
+
+RUN_TTL       = 900    # seconds a finished run's state is kept, streamed or not
+REAP_INTERVAL = 60     # seconds between eviction sweeps
+MAX_BACKLOG   = 1024   # SSE messages kept per run and queued per subscriber
+
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "8"))   # pipelines allowed to run at once
+MAX_PENDING      = PIPELINE_WORKERS * 4                        # running + waiting before /run answers 503
 
-app = Flask(__name__)
-CORS(app)
+_pipeline_slots = asyncio.Semaphore(PIPELINE_WORKERS)
 
-# run_id → Queue of SSE messages
-_runs: dict[str, queue.Queue] = {}
+# Write the voice script alongside the Risk Agent; faster, but the briefing then omits risks
+VOICE_OVERLAPS_RISK = os.getenv("VOICE_OVERLAPS_RISK", "").lower() in ("1", "true", "yes")
+
+
+# ─────────────────────────────────────────────
+# RUN STATE
+# ─────────────────────────────────────────────
+
+class _Run:
+    """SSE messages of one pipeline run, replayed and fanned out to every subscriber."""
+
+    def __init__(self):
+        self.finished_at: Optional[float] = None
+        self.history: deque[str] = deque(maxlen=MAX_BACKLOG)
+        self.subscribers: list[asyncio.Queue] = []
+        self.finished = False
+
+    def publish(self, msg: Optional[str]):
+        """Deliver `msg` to all subscribers; None marks the end of the run."""
+        if msg is None:
+            self.finished = True
+            self.finished_at = time.time()
+        else:
+            self.history.append(msg)
+        for q in self.subscribers:
+            if q.full():
+                # Subscriber fell behind: drop its oldest message, never the end sentinel
+                q.get_nowait()
+            q.put_nowait(msg)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Return a queue pre-filled with everything published so far, then the live tail."""
+        q = asyncio.Queue(maxsize=MAX_BACKLOG)
+        for msg in self.history:
+            q.put_nowait(msg)
+        if self.finished:
+            if q.full():
+                q.get_nowait()
+            q.put_nowait(None)
+        self.subscribers.append(q)
+        return q
+
+
+# run_id → run state
+_runs: dict[str, _Run] = {}
+
+# (normalised topic, include_voice) → run_id of the pipeline currently running for it
+_inflight: dict[tuple[str, bool], str] = {}
 
 
 # ─────────────────────────────────────────────
 # HELPERS
 # ─────────────────────────────────────────────
 
+def _run_key(topic: str, include_voice: bool) -> tuple[str, bool]:
+    """Key under which identical concurrent requests share one pipeline run."""
+    return normalise_topic(topic), include_voice
+
+
+async def _reap_runs():
+    """Evict runs that finished over RUN_TTL ago, e.g. ones whose client never opened the stream."""
+    while True:
+        await asyncio.sleep(REAP_INTERVAL)
+        cutoff = time.time() - RUN_TTL
+        for run_id, run in list(_runs.items()):
+            # Runs still going (or waiting for a slot) are never evicted
+            if run.finished and run.finished_at < cutoff:
+                del _runs[run_id]
+
+
 def _sse(event: str, data: str) -> str:
     """Format a Server-Sent Event message."""
     payload = data.replace("\n", "\\n")
     return f"event: {event}\ndata: {payload}\n\n"
 
 
-def _run_pipeline(run_id: str, topic: str, include_voice: bool):
-    """Execute the pipeline in a background thread, pushing SSE messages to the queue."""
-    q = _runs[run_id]
+async def _run_pipeline(run_id: str, topic: str, include_voice: bool):
+    """Execute the pipeline as a background task, publishing SSE messages to the run."""
+    run = _runs[run_id]
 
     def emit(msg: str):
-        q.put(_sse("log", msg))
+        run.publish(_sse("log", msg))
 
     try:
         emit(f"🚀 Pipeline started for topic: '{topic}'")
 
         # Agent 1 — Data
         emit("🔍 [Data Agent] Searching for recent news...")
-        articles = data_agent(topic, emit=emit)
+        articles = await data_agent(topic, emit=emit)
         if not articles:
-            q.put(_sse("error", "No news articles retrieved. Pipeline aborted."))
+            run.publish(_sse("error", "No news articles retrieved. Pipeline aborted."))
             return
 
-        # Agent 2 — Trend
+        # Agents 2 + 3 — Trend and Strategy share one Reka call
         emit("📈 [Trend Agent] Detecting market trends and sentiment shifts...")
-        trends = trend_agent(articles, emit=emit)
-
-        # Agent 3 — Strategy
         emit("💡 [Strategy Agent] Generating strategic opportunities...")
-        strategy = strategy_agent(trends, emit=emit)
+        trends, strategy = await trend_and_strategy_agent(articles, emit=emit)
 
-        # Agent 4 — Risk
-        emit("⚠️  [Risk Agent] Identifying risks and weak signals...")
-        risks = risk_agent(trends, strategy, emit=emit)
+        def stream_voice(text: str):
+            run.publish(_sse("voice", text))
 
-        # Optional Voice
-        voice_script = None
-        if include_voice:
+        # Agent 4 — Risk, then the optional Voice script (or both at once if configured)
+        emit("⚠️  [Risk Agent] Identifying risks and weak signals...")
+        if include_voice and VOICE_OVERLAPS_RISK:
             emit("🎙️  [Voice Agent] Writing broadcast script...")
-            brief = (
-                f"Market Intelligence on '{topic}': "
-                + " | ".join(trends.get("trends", [])) + ". "
-                + "Opportunities: " + "; ".join(strategy.get("opportunities", [])) + ". "
-                + "Key Risks: " + "; ".join(risks.get("risks", []))
+            risks, voice_script = await asyncio.gather(
+                risk_agent(trends, strategy, emit=emit),
+                voice_agent(voice_brief(topic, trends, strategy), emit=emit, on_token=stream_voice),
             )
-            voice_script = voice_agent(brief, emit=emit)
+        else:
+            risks = await risk_agent(trends, strategy, emit=emit)
+            voice_script = None
+            if include_voice:
+                emit("🎙️  [Voice Agent] Writing broadcast script...")
+                voice_script = await voice_agent(
+                    voice_brief(topic, trends, strategy, risks), emit=emit, on_token=stream_voice,
+                )
 
         # Build structured report dict for the frontend
         report = {
@@ -87,13 +166,43 @@ def _run_pipeline(run_id: str, topic: str, include_voice: bool):
         }
 
         emit("✅ Pipeline complete.")
-        q.put(_sse("done", json.dumps(report)))
+        run.publish(_sse("done", orjson.dumps(report).decode()))
 
     except Exception as exc:
-        q.put(_sse("error", f"Pipeline error: {exc}"))
+        run.publish(_sse("error", f"Pipeline error: {exc}"))
     finally:
-        # Sentinel: tell the SSE generator to close
-        q.put(None)
+        # Sentinel: tell the SSE generators to close
+        run.publish(None)
+        key = _run_key(topic, include_voice)
+        if _inflight.get(key) == run_id:
+            del _inflight[key]
+
+
+async def _run_pipeline_bounded(run_id: str, topic: str, include_voice: bool):
+    """Wait for one of the PIPELINE_WORKERS slots, then run the pipeline."""
+    if _pipeline_slots.locked():
+        _runs[run_id].publish(_sse("log", "⏳ Waiting for a free pipeline slot..."))
+    async with _pipeline_slots:
+        await _run_pipeline(run_id, topic, include_voice)
+
+
+# ─────────────────────────────────────────────
+# LIFECYCLE
+# ─────────────────────────────────────────────
+
+_reaper: Optional[asyncio.Task] = None
+
+
+@app.before_serving
+async def startup():
+    global _reaper
+    _reaper = asyncio.create_task(_reap_runs())
+
+
+@app.after_serving
+async def shutdown():
+    _reaper.cancel()
+    await close_reka_session()
 
 
 # ─────────────────────────────────────────────
@@ -101,45 +210,58 @@ def _run_pipeline(run_id: str, topic: str, include_voice: bool):
 # ─────────────────────────────────────────────
 
 @app.route("/")
-def index():
-    return render_template("index.html")
+async def index():
+    return await render_template("index.html")
 
 
 @app.route("/run", methods=["POST"])
-def start_run():
-    data = request.get_json(force=True)
+async def start_run():
+    data = await request.get_json(force=True)
     topic = data.get("topic", "").strip()
     if not topic:
         return jsonify({"error": "topic is required"}), 400
 
     include_voice = bool(data.get("include_voice", True))
+
+    # Same request already running: attach to its stream instead of paying for a second run
+    key = _run_key(topic, include_voice)
+    if key in _inflight:
+        return jsonify({"run_id": _inflight[key]})
+
+    # Every in-flight run is either running or waiting for a slot
+    if len(_inflight) >= MAX_PENDING:
+        return jsonify({"error": "Server is busy, please try again shortly."}), 503
+
     run_id = str(uuid.uuid4())
-    _runs[run_id] = queue.Queue()
+    _runs[run_id] = _Run()
+    _inflight[key] = run_id
 
-    t = threading.Thread(target=_run_pipeline, args=(run_id, topic, include_voice), daemon=True)
-    t.start()
+    app.add_background_task(_run_pipeline_bounded, run_id, topic, include_voice)
 
     return jsonify({"run_id": run_id})
 
 
 @app.route("/stream/<run_id>")
-def stream(run_id: str):
+async def stream(run_id: str):
     if run_id not in _runs:
         return Response("Unknown run_id", status=404)
 
-    q = _runs[run_id]
+    run = _runs[run_id]
+    q = run.subscribe()
 
-    def generate():
-        while True:
-            msg = q.get()
-            if msg is None:
-                # Clean up and close stream
-                _runs.pop(run_id, None)
-                break
-            yield msg
+    async def generate():
+        try:
+            while (msg := await q.get()) is not None:
+                yield msg
+        finally:
+            # The run stays in _runs for late joiners to replay; the reaper evicts it
+            run.subscribers.remove(q)
 
-    return Response(generate(), mimetype="text/event-stream",
-                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    response = Response(generate(), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    # A full run can outlast Quart's default 60 s response timeout
+    response.timeout = None
+    return response
 
 
 # ─────────────────────────────────────────────
@@ -148,4 +270,4 @@ def stream(run_id: str):
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
-    app.run(debug=True, threaded=True, host="0.0.0.0", port=port)
+    app.run(debug=True, host="0.0.0.0", port=port)
@@ -2,7 +2,7 @@
 Multi-Agent Market Intelligence System
 Hackathon Prototype
 
-Agents: Data Agent → Trend Agent → Strategy Agent → Risk Agent → Final Report
+Agents: Data Agent → Trend & Strategy Agent → Risk Agent → Voice Agent → Final Report
 
 APIs Used:
   - Tavily  : Real-time news search
@@ -12,12 +12,27 @@ APIs Used:
 Insert your API keys in the CONFIG section below.
 """
 
+import io
 import os
-import json
+import re
+import sys
+import time
+import queue
+import atexit
+import logging
+import asyncio
+import hashlib
+import sqlite3
 import datetime
+import threading
+import aiohttp
+import orjson
 import requests
 from typing import Optional, Callable
-from reka.client import Reka
+from logging.handlers import QueueHandler, QueueListener
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -30,45 +45,357 @@ REKA_API_KEY     = os.getenv("REKA_API_KEY",     "YOUR_REKA_KEY")
 MODULATE_API_KEY = os.getenv("MODULATE_API_KEY", "YOUR_MODULATE_KEY")  # optional
 
 TAVILY_ENDPOINT = "https://api.tavily.com/search"
+REKA_ENDPOINT   = "https://api.reka.ai/v1/chat"
+REKA_TIMEOUT    = 120              # seconds per Reka request
+REKA_MAX_CONCURRENCY = 32          # Reka requests in flight at once per event loop
 REKA_MODEL      = "reka-core-20240501"   # use reka-flash for faster speeds
+SUMMARY_MODEL   = "reka-flash"           # one-sentence summaries don't need the large model
 MAX_ARTICLES    = 10               # number of news articles to fetch
+SUMMARY_SENTENCES = 3              # leading sentences of each article sent for summarisation
+SUMMARY_MAX_BYTES = 800            # hard cap, in UTF-8 bytes, on that excerpt
+SUMMARY_MAX_TOKENS = 60            # output budget for a one-sentence summary
+JSON_MAX_TOKENS    = 300           # output budget for the risk JSON
+TREND_STRATEGY_MAX_TOKENS = 600    # combined trend + strategy JSON carries both sections
+VOICE_MAX_TOKENS   = 400           # output budget for the 60-second voice script
+CACHE_PATH      = os.getenv("REKA_CACHE_PATH", ".reka_cache.sqlite3")   # on-disk response cache
+CACHE_TTL       = int(os.getenv("REKA_CACHE_TTL", 24 * 3600))          # seconds a cached reply stays valid
+CACHE_MAX_ROWS  = int(os.getenv("REKA_CACHE_MAX_ROWS", 50_000))        # oldest replies beyond this are dropped
+SEARCH_CACHE_TTL = 1800            # seconds a topic's Tavily results are reused
 
-client = Reka(api_key=REKA_API_KEY)
+
+# ─────────────────────────────────────────────
+# PROMPTS — agent system instructions
+#   All static wording lives here and is sent first,
+#   byte-identical on every call, so the prompt prefix
+#   stays cacheable; user messages carry only data.
+# ─────────────────────────────────────────────
+SUMMARY_SYS = "You are a concise financial news analyst. Summarise the article in one sentence."
+
+RISK_SYS = (
+    "You are a risk analyst specialising in emerging market threats. "
+    "From the market trends and proposed strategies provided, "
+    "identify the key risks, weak signals, and uncertainties. "
+    "Return ONLY valid JSON with three keys: "
+    "\"risks\" (list of 3 market risk strings), "
+    "\"weak_signals\" (list of 2 early warning signals), and "
+    "\"uncertainties\" (list of 2 major uncertainty factors). "
+    "No markdown, no code fences."
+)
+
+TREND_STRATEGY_SYS = (
+    "You are a market research analyst and senior business strategist. "
+    "From the news summaries provided, identify 3 major market trends and any notable sentiment shifts, "
+    "then turn them into concrete business opportunities and strategic recommendations. "
+    "Return ONLY valid JSON with four keys: "
+    "\"trends\" (list of 3 strings), "
+    "\"sentiment_shifts\" (list of up to 3 strings describing sentiment changes), "
+    "\"opportunities\" (list of 3 business opportunity strings) and "
+    "\"recommendations\" (list of 3 strategic recommendation strings). "
+    "No markdown, no code fences."
+)
+
+VOICE_SYS = (
+    "You are a professional radio broadcaster. "
+    "Convert the market intelligence report into a concise 60-second verbal briefing. "
+    "Use natural, spoken language."
+)
+
+# One keep-alive session per process so repeat Tavily searches skip the TCP+TLS handshake.
+# Tavily search is read-only, so retrying the POST on transient errors is safe.
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset({"POST"}),
+    ),
+))
+
+# (normalised topic, MAX_ARTICLES) → Tavily results, so hot topics skip the search round trip
+_SEARCH_CACHE: TTLCache = TTLCache(maxsize=512, ttl=SEARCH_CACHE_TTL)
 
 Emitter = Optional[Callable[[str], None]]
 
+# Agents log into a queue and a background listener writes to stdout, so pipeline
+# code never blocks on the stdout lock while many runs are logging at once.
+logger = logging.getLogger("market_intel")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+logger.addHandler(QueueHandler(_log_queue))
+_stdout_handler = logging.StreamHandler(sys.stdout)
+_stdout_handler.setFormatter(logging.Formatter("%(message)s"))
+_log_listener = QueueListener(_log_queue, _stdout_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)   # flush anything still queued on exit
+
+
+# ─────────────────────────────────────────────
+# HELPER — response cache in front of Reka
+# ─────────────────────────────────────────────
+class _ResponseCache:
+    """
+    Exact-match prompt → completion cache persisted in SQLite so it
+    survives restarts. A repeated topic usually pulls the same articles,
+    which makes every downstream prompt byte-identical as well, so one
+    hit on the summaries cascades through the whole pipeline.
+    Expired rows and rows beyond `max_rows` are pruned on startup and
+    every PRUNE_EVERY inserts, so the file stays bounded on a long-lived
+    server.
+    """
+
+    PRUNE_EVERY = 200
+
+    def __init__(self, path: str, ttl: int, max_rows: int):
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._inserts = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key BLOB PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_created_at ON responses (created_at)")
+        self._prune()
+        self._db.commit()
+
+    def _prune(self) -> None:
+        """Delete expired rows, then the oldest rows beyond `max_rows`. Caller holds the lock."""
+        self._db.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+        self._db.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,),
+        )
+
+    @staticmethod
+    def key(*parts: str) -> bytes:
+        return hashlib.blake2b("\0".join(parts).encode(), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return row[0]
+
+    def set(self, key: bytes, response: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)", (key, response, time.time())
+            )
+            self._inserts += 1
+            if self._inserts % self.PRUNE_EVERY == 0:
+                self._prune()
+            self._db.commit()
+
+
+_cache = _ResponseCache(CACHE_PATH, CACHE_TTL, CACHE_MAX_ROWS)
+
 
 # ─────────────────────────────────────────────
 # HELPER — thin wrapper around Reka chat
+#   Direct aiohttp POSTs to the REST endpoint. aiohttp
+#   sessions are bound to the event loop that made
+#   them, so each loop gets its own session + limiter.
 # ─────────────────────────────────────────────
-def _chat(system: str, user: str) -> str:
-    """Send a single chat completion request to Reka and return the text."""
-    response = client.chat.create(
-        model=REKA_MODEL,
-        messages=[
-            {"role": "user",   "content": f"System Instruction: {system}\n\nUser Question: {user}"},
+_reka_sessions: dict[asyncio.AbstractEventLoop, tuple[aiohttp.ClientSession, asyncio.Semaphore]] = {}
+# Cleared the first time the endpoint rejects `response_format`
+_structured_output = True
+
+
+def _reka_session() -> tuple[aiohttp.ClientSession, asyncio.Semaphore]:
+    """Return the Reka session and concurrency limiter for the running event loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _reka_sessions:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=64, limit_per_host=32, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=REKA_TIMEOUT),
+            headers={"X-Api-Key": REKA_API_KEY, "Content-Type": "application/json"},
+        )
+        _reka_sessions[loop] = (session, asyncio.Semaphore(REKA_MAX_CONCURRENCY))
+    return _reka_sessions[loop]
+
+
+async def close_reka_session() -> None:
+    """Close the running loop's Reka session; call before the loop shuts down."""
+    entry = _reka_sessions.pop(asyncio.get_running_loop(), None)
+    if entry:
+        await entry[0].close()
+
+
+async def _read_stream(
+    resp: aiohttp.ClientResponse, on_delta: Callable[[str], None],
+) -> tuple[str, Optional[str]]:
+    """
+    Collect a streamed Reka reply from its SSE lines, forwarding each new
+    piece of text. Returns the text and the final chunk's finish_reason.
+    """
+    text, finish_reason = "", None
+    async for line in resp.content:
+        if not line.startswith(b"data:"):
+            continue
+        payload = line[5:].strip()
+        if not payload or payload == b"[DONE]":
+            continue
+        try:
+            chunk = orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            # Keep-alives and other non-JSON lines carry no text
+            continue
+        responses = chunk.get("responses") if isinstance(chunk, dict) else None
+        if not responses:
+            continue
+        finish_reason = responses[0].get("finish_reason") or finish_reason
+        content = (responses[0].get("chunk") or {}).get("content") or ""
+        # Chunks carry the reply so far; append as-is if a server sends bare deltas instead
+        delta = content[len(text):] if content.startswith(text) else content
+        if delta:
+            text += delta
+            on_delta(delta)
+    return text, finish_reason
+
+
+async def _post_chat(body: dict, on_delta: Emitter) -> tuple[str, Optional[str]]:
+    """POST one chat request and return the reply text and its finish_reason."""
+    session, limit = _reka_session()
+    async with limit:
+        async with session.post(REKA_ENDPOINT, data=orjson.dumps(body)) as resp:
+            if not resp.ok:
+                # Keep the error body as the message; it names the field a 400/422 objected to
+                raise aiohttp.ClientResponseError(
+                    resp.request_info, resp.history,
+                    status=resp.status, message=await resp.text(), headers=resp.headers,
+                )
+            if on_delta is not None:
+                return await _read_stream(resp, on_delta)
+            data = await resp.json(loads=orjson.loads)
+            reply = data["responses"][0]
+            return reply["message"]["content"], reply.get("finish_reason")
+
+
+async def _chat_async(
+    system: str,
+    user: str,
+    model: str = REKA_MODEL,
+    *,
+    json_schema: Optional[dict] = None,
+    max_tokens: int = 256,
+    on_delta: Emitter = None,
+) -> str:
+    """
+    Send a single chat completion request to Reka and return the text.
+    With `json_schema`, Reka is asked for structured output matching it;
+    if the request is refused, it is retried once without it and the
+    prompt alone asks for JSON. Only an error naming the field turns
+    structured output off for later calls.
+    With `on_delta`, the reply is streamed and each new piece of text is
+    passed to it as it arrives.
+    Only complete replies (and, with `json_schema`, parseable ones) are
+    cached; anything else is returned but asked for again next time.
+    """
+    global _structured_output
+    schema_key = orjson.dumps(json_schema).decode() if json_schema else ""
+    key = _cache.key(model, system, user, schema_key, str(max_tokens))
+    cached = await asyncio.to_thread(_cache.get, key)
+    if cached is not None:
+        return cached
+
+    body = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system},
+            {"role": "user",   "content": user},
         ],
-    )
-    # The Reka SDK returns responses[0].message.content
-    return response.responses[0].message.content.strip()
+        "max_tokens": max_tokens,
+        "stream": on_delta is not None,
+    }
+    if json_schema and _structured_output:
+        body["response_format"] = {
+            "type": "json_schema",
+            "json_schema": {"name": "response", "schema": json_schema},
+        }
+
+    try:
+        text, finish_reason = await _post_chat(body, on_delta)
+    except aiohttp.ClientResponseError as e:
+        if "response_format" not in body or e.status not in (400, 422):
+            raise
+        if "response_format" in e.message or "json_schema" in e.message:
+            _structured_output = False
+            logger.warning(f"Reka rejected response_format ({e.status}); falling back to prompt-only JSON")
+        del body["response_format"]
+        text, finish_reason = await _post_chat(body, on_delta)
+
+    text = text.strip()
+    # Only cache replies known to be good, or one bad reply sticks for CACHE_TTL
+    if finish_reason == "length":
+        logger.warning(f"Reka reply hit max_tokens={max_tokens}; not caching the truncated text")
+        return text
+    if finish_reason != "stop":
+        return text
+    if json_schema:
+        try:
+            _parse_json(text)
+        except orjson.JSONDecodeError:
+            logger.warning("Reka reply is not valid JSON; not caching it")
+            return text
+    await asyncio.to_thread(_cache.set, key, text)
+    return text
+
+
+def normalise_topic(topic: str) -> str:
+    """Case- and whitespace-insensitive form of `topic`, shared by every topic-keyed cache."""
+    return " ".join(topic.lower().split())
+
+
+# Whitespace following sentence-ending punctuation
+_SENT_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def _first_n_sentences(text: str, n: int) -> str:
+    """Return the first `n` sentences of `text` — for news, the headline and lede."""
+    return " ".join(_SENT_RE.split(text, maxsplit=n)[:n])
+
+
+# Optional ```json / ``` fence around the body; the closing fence may be missing
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*(?:```)?\s*$", re.DOTALL)
 
 
 def _parse_json(raw: str):
     """
     Robustly parse JSON from an LLM response that may be wrapped in
     markdown code fences (```json ... ``` or ``` ... ```).
+    Structured-output replies are plain JSON, so try that first.
     """
-    text = raw.strip()
-    # Strip opening fence: ```json or ```
-    if text.startswith("```"):
-        text = text[3:]
-        if text.startswith("json"):
-            text = text[4:]
-        text = text.strip()
-    # Strip closing fence
-    if text.endswith("```"):
-        text = text[:-3].strip()
-    return json.loads(text)
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        pass
+    m = _FENCE_RE.match(raw)
+    text = m.group(1) if m else raw.strip()
+    return orjson.loads(text)
+
+
+def _string_lists_schema(*keys: str) -> dict:
+    """JSON Schema for an object whose `keys` each hold a list of strings."""
+    return {
+        "type": "object",
+        "properties": {k: {"type": "array", "items": {"type": "string"}} for k in keys},
+        "required": list(keys),
+    }
+
+
+RISK_SCHEMA = _string_lists_schema("risks", "weak_signals", "uncertainties")
+TREND_STRATEGY_SCHEMA = _string_lists_schema(
+    "trends", "sentiment_shifts", "opportunities", "recommendations",
+)
 
 
 # ─────────────────────────────────────────────
@@ -76,154 +403,140 @@ def _parse_json(raw: str):
 #   Input : topic (str)
 #   Output: list of dicts {headline, source, summary}
 # ─────────────────────────────────────────────
-def data_agent(topic: str, emit: Emitter = None) -> list[dict]:
+async def data_agent(topic: str, emit: Emitter = None) -> list[dict]:
     """
     Fetches recent news about the topic via Tavily,
     then uses Reka to produce a clean one-sentence summary per article.
     """
     def log(msg):
-        print(msg)
+        logger.info(msg)
         if emit:
             emit(msg)
 
     log(f"[Data Agent] 🔍 Searching news for: '{topic}' ...")
 
     # --- Step 1: Pull real-time news with Tavily Search API ---
-    payload = {
-        "api_key":        TAVILY_API_KEY,
-        "query":          topic,
-        "search_depth":   "advanced",
-        "include_answer": False,
-        "max_results":    MAX_ARTICLES,
-        "topic":          "news",   # restrict to news results
-    }
-    resp = requests.post(TAVILY_ENDPOINT, json=payload, timeout=30)
-    resp.raise_for_status()
-    raw_results = resp.json().get("results", [])
+    search_key = (normalise_topic(topic), MAX_ARTICLES)
+    raw_results = _SEARCH_CACHE.get(search_key)
+    if raw_results is not None:
+        log("[Data Agent] ♻️  Reusing recent search results.")
+    else:
+        payload = {
+            "api_key":        TAVILY_API_KEY,
+            "query":          topic,
+            "search_depth":   "advanced",
+            "include_answer": False,
+            "max_results":    MAX_ARTICLES,
+            "topic":          "news",   # restrict to news results
+        }
+        resp = await asyncio.to_thread(_HTTP.post, TAVILY_ENDPOINT, json=payload, timeout=30)
+        resp.raise_for_status()
+        raw_results = resp.json().get("results", [])
+        if raw_results:
+            _SEARCH_CACHE[search_key] = raw_results
 
     if not raw_results:
         log("[Data Agent] ⚠️  No results returned from Tavily.")
         return []
 
-    # --- Step 2: Summarise each article with Reka ---
-    articles = []
-    for item in raw_results[:MAX_ARTICLES]:
+    # --- Step 2: Summarise every article with Reka concurrently ---
+    items = raw_results[:MAX_ARTICLES]
+
+    summaries = [""] * len(items)
+
+    async def summarise(i: int, item: dict):
         headline = item.get("title", "No title")
-        source   = item.get("url",   "Unknown source")
         content  = item.get("content", item.get("snippet", ""))
-
-        summary = _chat(
-            system="You are a concise financial news analyst. Summarise the article in one sentence.",
-            user=f"Article title: {headline}\n\nContent: {content[:1500]}",
+        # The lede is enough for a one-sentence summary; the byte cap also bounds
+        # CJK/emoji-heavy text and articles without sentence punctuation
+        content  = _first_n_sentences(content, SUMMARY_SENTENCES)
+        content  = content.encode("utf-8")[:SUMMARY_MAX_BYTES].decode("utf-8", "ignore")
+        summary = await _chat_async(
+            system=SUMMARY_SYS,
+            user=f"Article title: {headline}\n\nContent: {content}",
+            model=SUMMARY_MODEL,
+            max_tokens=SUMMARY_MAX_TOKENS,
         )
+        # Log each headline as soon as its summary lands, but keep results in search order
+        summaries[i] = summary
+        log(f"  ✔ {headline[:80]}")
 
-        articles.append({
-            "headline": headline,
-            "source":   source,
+    # If one summary fails, the task group cancels the rest instead of leaving them running
+    try:
+        async with asyncio.TaskGroup() as tg:
+            for i, item in enumerate(items):
+                tg.create_task(summarise(i, item))
+    except ExceptionGroup as eg:
+        raise eg.exceptions[0] from None
+
+    articles = [
+        {
+            "headline": item.get("title", "No title"),
+            "source":   item.get("url",   "Unknown source"),
             "summary":  summary,
-        })
-        log(f"  ✔ {headline[:80]}")
+        }
+        for item, summary in zip(items, summaries)
+    ]
 
     return articles
 
 
 # ─────────────────────────────────────────────
-# AGENT 2 — Trend Agent
+# AGENT 2+3 — Trend & Strategy in a single call
 #   Input : list of article dicts from Data Agent
-#   Output: dict {trends: [...], sentiment_shifts: [...]}
+#   Output: (dict {trends: [...], sentiment_shifts: [...]},
+#            dict {opportunities: [...], recommendations: [...]})
 # ─────────────────────────────────────────────
-def trend_agent(articles: list[dict], emit: Emitter = None) -> dict:
+async def trend_and_strategy_agent(articles: list[dict], emit: Emitter = None) -> tuple[dict, dict]:
     """
-    Uses Reka to identify the 3 major trends and any sentiment shifts
-    across the collected news summaries.
+    Detects trends and derives opportunities and recommendations from
+    them in one Reka request, saving a round trip on the serial
+    Data → Trend → Strategy → Risk chain.
     """
     def log(msg):
-        print(msg)
+        logger.info(msg)
         if emit:
             emit(msg)
 
-    log("[Trend Agent] 📈 Detecting trends and sentiment shifts ...")
+    log("[Trend & Strategy Agent] 📈💡 Detecting trends and generating strategy ...")
 
-    # Build a compact brief from the article summaries
     brief = "\n".join(
         f"- [{a['source']}] {a['headline']}: {a['summary']}"
         for a in articles
     )
 
-    raw = _chat(
-        system=(
-            "You are a market research analyst specialising in trend detection. "
-            "Return ONLY valid JSON with two keys: "
-            "\"trends\" (list of 3 strings) and "
-            "\"sentiment_shifts\" (list of strings describing sentiment changes). "
-            "No markdown, no code fences."
-        ),
-        user=f"News summaries:\n{brief}\n\nIdentify 3 major market trends and any notable sentiment shifts.",
+    raw = await _chat_async(
+        system=TREND_STRATEGY_SYS,
+        user=f"News summaries:\n{brief}",
+        json_schema=TREND_STRATEGY_SCHEMA,
+        max_tokens=TREND_STRATEGY_MAX_TOKENS,
     )
 
-    # --- Parse JSON robustly ---
     try:
         result = _parse_json(raw)
-    except (json.JSONDecodeError, ValueError):
-        # Fallback: wrap raw text so pipeline keeps running
+    except (orjson.JSONDecodeError, ValueError):
         result = {
-            "trends": [raw],
+            "trends":           [raw],
             "sentiment_shifts": ["Unable to parse structured output."],
-        }
-
-    for i, t in enumerate(result.get("trends", []), 1):
-        log(f"  Trend {i}: {t}")
-
-    return result
-
-
-# ─────────────────────────────────────────────
-# AGENT 3 — Strategy Agent
-#   Input : trend dict from Trend Agent
-#   Output: dict {opportunities: [...], recommendations: [...]}
-# ─────────────────────────────────────────────
-def strategy_agent(trend_data: dict, emit: Emitter = None) -> dict:
-    """
-    Converts detected trends into business opportunities and
-    actionable strategic recommendations using Reka.
-    """
-    def log(msg):
-        print(msg)
-        if emit:
-            emit(msg)
-
-    log("[Strategy Agent] 💡 Generating strategic opportunities ...")
-
-    trend_text = "\n".join(f"- {t}" for t in trend_data.get("trends", []))
-    sentiment_text = "\n".join(f"- {s}" for s in trend_data.get("sentiment_shifts", []))
-
-    raw = _chat(
-        system=(
-            "You are a senior business strategist. "
-            "Return ONLY valid JSON with two keys: "
-            "\"opportunities\" (list of 3 business opportunity strings) and "
-            "\"recommendations\" (list of 3 strategic recommendation strings). "
-            "No markdown, no code fences."
-        ),
-        user=(
-            f"Market Trends:\n{trend_text}\n\n"
-            f"Sentiment Shifts:\n{sentiment_text}\n\n"
-            "Generate concrete business opportunities and strategic recommendations."
-        ),
-    )
-
-    try:
-        result = _parse_json(raw)
-    except (json.JSONDecodeError, ValueError):
-        result = {
-            "opportunities":    [raw],
+            "opportunities":    ["Unable to parse structured output."],
             "recommendations":  ["Unable to parse structured output."],
         }
 
-    for i, o in enumerate(result.get("opportunities", []), 1):
+    trends = {
+        "trends":           result.get("trends", []),
+        "sentiment_shifts": result.get("sentiment_shifts", []),
+    }
+    strategy = {
+        "opportunities":    result.get("opportunities", []),
+        "recommendations":  result.get("recommendations", []),
+    }
+
+    for i, t in enumerate(trends["trends"], 1):
+        log(f"  Trend {i}: {t}")
+    for i, o in enumerate(strategy["opportunities"], 1):
         log(f"  Opportunity {i}: {o}")
 
-    return result
+    return trends, strategy
 
 
 # ─────────────────────────────────────────────
@@ -231,13 +544,13 @@ def strategy_agent(trend_data: dict, emit: Emitter = None) -> dict:
 #   Input : trend dict + strategy dict
 #   Output: dict {risks: [...], weak_signals: [...], uncertainties: [...]}
 # ─────────────────────────────────────────────
-def risk_agent(trend_data: dict, strategy_data: dict, emit: Emitter = None) -> dict:
+async def risk_agent(trend_data: dict, strategy_data: dict, emit: Emitter = None) -> dict:
     """
     Identifies market risks, weak signals, and areas of uncertainty
     by cross-referencing trends with proposed strategies.
     """
     def log(msg):
-        print(msg)
+        logger.info(msg)
         if emit:
             emit(msg)
 
@@ -246,25 +559,19 @@ def risk_agent(trend_data: dict, strategy_data: dict, emit: Emitter = None) -> d
     trend_text    = "\n".join(f"- {t}" for t in trend_data.get("trends", []))
     strategy_text = "\n".join(f"- {r}" for r in strategy_data.get("recommendations", []))
 
-    raw = _chat(
-        system=(
-            "You are a risk analyst specialising in emerging market threats. "
-            "Return ONLY valid JSON with three keys: "
-            "\"risks\" (list of 3 market risk strings), "
-            "\"weak_signals\" (list of 2 early warning signals), and "
-            "\"uncertainties\" (list of 2 major uncertainty factors). "
-            "No markdown, no code fences."
-        ),
+    raw = await _chat_async(
+        system=RISK_SYS,
         user=(
             f"Market Trends:\n{trend_text}\n\n"
-            f"Proposed Strategies:\n{strategy_text}\n\n"
-            "Identify the key risks, weak signals, and uncertainties."
+            f"Proposed Strategies:\n{strategy_text}"
         ),
+        json_schema=RISK_SCHEMA,
+        max_tokens=JSON_MAX_TOKENS,
     )
 
     try:
         result = _parse_json(raw)
-    except (json.JSONDecodeError, ValueError):
+    except (orjson.JSONDecodeError, ValueError):
         result = {
             "risks":         [raw],
             "weak_signals":  ["Unable to parse structured output."],
@@ -280,25 +587,46 @@ def risk_agent(trend_data: dict, strategy_data: dict, emit: Emitter = None) -> d
 # ─────────────────────────────────────────────
 # OPTIONAL — Voice Script (Modulate placeholder)
 # ─────────────────────────────────────────────
-def voice_agent(report_text: str, emit: Emitter = None) -> str:
+def voice_brief(
+    topic: str,
+    trend_data: dict,
+    strategy_data: dict,
+    risk_data: Optional[dict] = None,
+) -> str:
+    """
+    Builds the short text summary the Voice Agent reads from.
+    Pass `risk_data` for the full briefing with key risks. Without it the
+    brief covers recommendations instead, so the Voice Agent can run
+    alongside the Risk Agent.
+    """
+    brief = (
+        f"Market Intelligence on '{topic}': "
+        + " | ".join(trend_data.get("trends", [])) + ". "
+        + "Opportunities: " + "; ".join(strategy_data.get("opportunities", [])) + ". "
+    )
+    if risk_data is not None:
+        return brief + "Key Risks: " + "; ".join(risk_data.get("risks", []))
+    return brief + "Recommendations: " + "; ".join(strategy_data.get("recommendations", []))
+
+
+async def voice_agent(report_text: str, emit: Emitter = None, on_token: Emitter = None) -> str:
     """
     Converts the final report into a short broadcast-style voice script.
     Uses Reka to write the script; Modulate would handle TTS playback.
+    If `on_token` is given, the script is streamed to it as it is written.
     """
     def log(msg):
-        print(msg)
+        logger.info(msg)
         if emit:
             emit(msg)
 
     log("[Voice Agent] 🎙️  Writing voice script ...")
 
-    script = _chat(
-        system=(
-            "You are a professional radio broadcaster. "
-            "Convert the market intelligence report into a concise 60-second verbal briefing. "
-            "Use natural, spoken language."
-        ),
+    script = await _chat_async(
+        system=VOICE_SYS,
         user=report_text,
+        max_tokens=VOICE_MAX_TOKENS,
+        on_delta=on_token,
     )
 
     # ── Modulate TTS placeholder ──────────────────────────
@@ -332,108 +660,111 @@ def render_report(
     now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
     sep = "─" * 60
 
-    lines = [
-        "",
-        "╔" + "═" * 58 + "╗",
-        f"║{'MARKET INTELLIGENCE REPORT':^58}║",
-        f"║{'Topic: ' + topic:^58}║",
-        f"║{now:^58}║",
-        "╚" + "═" * 58 + "╝",
-        "",
-        f"{'📰 LATEST NEWS':}",
-        sep,
-    ]
-
+    buf = io.StringIO()
+    write = buf.write
+
+    write(
+        "\n"
+        f"╔{'═' * 58}╗\n"
+        f"║{'MARKET INTELLIGENCE REPORT':^58}║\n"
+        f"║{'Topic: ' + topic:^58}║\n"
+        f"║{now:^58}║\n"
+        f"╚{'═' * 58}╝\n"
+        "\n"
+        f"📰 LATEST NEWS\n{sep}\n"
+    )
     for a in articles:
-        lines += [
-            f"  • {a['headline']}",
-            f"    Source : {a['source']}",
-            f"    Summary: {a['summary']}",
-            "",
-        ]
-
-    lines += [f"{'📈 MARKET TRENDS':}", sep]
+        write(
+            f"  • {a['headline']}\n"
+            f"    Source : {a['source']}\n"
+            f"    Summary: {a['summary']}\n"
+            "\n"
+        )
+
+    write(f"📈 MARKET TRENDS\n{sep}\n")
     for t in trends.get("trends", []):
-        lines.append(f"  • {t}")
-    lines.append("")
-    lines.append("  Sentiment Shifts:")
+        write(f"  • {t}\n")
+    write("\n  Sentiment Shifts:\n")
     for s in trends.get("sentiment_shifts", []):
-        lines.append(f"  ↳ {s}")
-    lines.append("")
+        write(f"  ↳ {s}\n")
+    write("\n")
 
-    lines += [f"{'💡 STRATEGIC OPPORTUNITIES':}", sep]
+    write(f"💡 STRATEGIC OPPORTUNITIES\n{sep}\n")
     for o in strategy.get("opportunities", []):
-        lines.append(f"  ✦ {o}")
-    lines.append("")
-    lines.append("  Recommendations:")
+        write(f"  ✦ {o}\n")
+    write("\n  Recommendations:\n")
     for r in strategy.get("recommendations", []):
-        lines.append(f"  → {r}")
-    lines.append("")
+        write(f"  → {r}\n")
+    write("\n")
 
-    lines += [f"{'⚠️  RISKS & SIGNALS':}", sep]
-    lines.append("  Market Risks:")
+    write(f"⚠️  RISKS & SIGNALS\n{sep}\n  Market Risks:\n")
     for r in risks.get("risks", []):
-        lines.append(f"  ✗ {r}")
-    lines.append("")
-    lines.append("  Weak Signals:")
+        write(f"  ✗ {r}\n")
+    write("\n  Weak Signals:\n")
     for w in risks.get("weak_signals", []):
-        lines.append(f"  ~ {w}")
-    lines.append("")
-    lines.append("  Uncertainties:")
+        write(f"  ~ {w}\n")
+    write("\n  Uncertainties:\n")
     for u in risks.get("uncertainties", []):
-        lines.append(f"  ? {u}")
-    lines.append("")
+        write(f"  ? {u}\n")
+    write("\n")
 
     if voice_script:
-        lines += [f"{'🎙️  VOICE BRIEFING':}", sep, voice_script, ""]
+        write(f"🎙️  VOICE BRIEFING\n{sep}\n{voice_script}\n\n")
 
-    lines += ["═" * 60, "  End of Report", "═" * 60, ""]
+    write(f"{'═' * 60}\n  End of Report\n{'═' * 60}\n")
 
-    return "\n".join(lines)
+    return buf.getvalue()
 
 
 # ─────────────────────────────────────────────
 # PIPELINE ENTRY POINT (CLI)
 # ─────────────────────────────────────────────
-def run_pipeline(topic: str, include_voice: bool = True) -> str:
+def run_pipeline(topic: str, include_voice: bool = True, overlap_voice: bool = False) -> str:
     """
     Orchestrates the full multi-agent pipeline:
-      topic → Data Agent → Trend Agent → Strategy Agent → Risk Agent → Report
+      topic → Data Agent → Trend & Strategy Agent → Risk Agent → Voice Agent → Report
+    With `overlap_voice`, the Voice Agent runs alongside the Risk Agent,
+    saving a round trip at the cost of leaving risks out of the briefing.
     """
-    print(f"\n{'═'*60}")
-    print(f"  🚀 Market Intelligence Pipeline Starting")
-    print(f"  Topic: {topic}")
-    print(f"{'═'*60}")
+    return asyncio.run(_run_pipeline_async(topic, include_voice, overlap_voice))
+
+
+async def _run_pipeline_async(topic: str, include_voice: bool, overlap_voice: bool) -> str:
+    try:
+        return await _run_agents(topic, include_voice, overlap_voice)
+    finally:
+        await close_reka_session()
+
+
+async def _run_agents(topic: str, include_voice: bool, overlap_voice: bool) -> str:
+    logger.info(f"\n{'═'*60}")
+    logger.info(f"  🚀 Market Intelligence Pipeline Starting")
+    logger.info(f"  Topic: {topic}")
+    logger.info(f"{'═'*60}")
 
     # Agent 1 — fetch & structure news
-    articles = data_agent(topic)
+    articles = await data_agent(topic)
     if not articles:
         return "Pipeline aborted: no news articles retrieved."
 
-    # Agent 2 — detect trends
-    trends = trend_agent(articles)
-
-    # Agent 3 — generate strategy
-    strategy = strategy_agent(trends)
-
-    # Agent 4 — assess risks
-    risks = risk_agent(trends, strategy)
+    # Agents 2 + 3 — detect trends and generate strategy in one call
+    trends, strategy = await trend_and_strategy_agent(articles)
 
-    # (Optional) Voice Agent
-    voice_script = None
-    if include_voice:
-        # Build a brief text summary to feed into the voice agent
-        brief = (
-            f"Market Intelligence on '{topic}': "
-            + " | ".join(trends.get("trends", [])) + ". "
-            + "Opportunities: " + "; ".join(strategy.get("opportunities", [])) + ". "
-            + "Key Risks: " + "; ".join(risks.get("risks", []))
+    # Agent 4 — assess risks, then the (optional) Voice Agent
+    if include_voice and overlap_voice:
+        risks, voice_script = await asyncio.gather(
+            risk_agent(trends, strategy),
+            voice_agent(voice_brief(topic, trends, strategy)),
         )
-        voice_script = voice_agent(brief)
+    else:
+        risks = await risk_agent(trends, strategy)
+        voice_script = None
+        if include_voice:
+            voice_script = await voice_agent(voice_brief(topic, trends, strategy, risks))
 
     # Render final report
     report = render_report(topic, articles, trends, strategy, risks, voice_script)
-    print(report)
+    logger.info(report)
     return report
 
 
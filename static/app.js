@@ -60,6 +60,7 @@
         line.textContent = text;
         consoleEl.appendChild(line);
         consoleEl.scrollTop = consoleEl.scrollHeight;
+        return line;
     }
 
     function setRunning(isRunning) {
@@ -245,6 +246,17 @@
                 detectStep(msg);
             });
 
+            // Voice script arrives piece by piece while the Voice Agent writes it
+            let voiceLine = null;
+            es.addEventListener('voice', (ev) => {
+                if (!voiceLine) {
+                    addConsoleLine('🎙️  Voice briefing:', 'log-info');
+                    voiceLine = addConsoleLine('');
+                }
+                voiceLine.textContent += ev.data.replace(/\\n/g, '\n');
+                consoleEl.scrollTop = consoleEl.scrollHeight;
+            });
+
             es.addEventListener('done', (ev) => {
                 es.close();
                 setRunning(false);